@@ -1,6 +1,26 @@
 import dash
 import dash_bootstrap_components as dbc
+import orjson
 from dash import dcc, html, Input, Output
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
+
+
+class ORJSONProvider(JSONProvider):
+    """orjson-backed Flask JSON provider for callback responses.
+
+    OPT_SERIALIZE_NUMPY serializes numpy arrays embedded in figures natively
+    instead of boxing every element through Python. ``default=str`` covers
+    the odd non-JSON type (dates, Decimals) the way Flask's encoder would.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY,
+                            default=str).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = dash.Dash(
     __name__,
@@ -10,6 +30,13 @@ app = dash.Dash(
     title="Databricks Demo App",
 )
 server = app.server  # expose Flask server for Databricks Apps
+server.json = ORJSONProvider(server)
+
+# Dash's text-heavy JSON payloads compress ~80%; prefer brotli, fall back to
+# gzip for clients that don't accept it.
+server.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+server.config["COMPRESS_MIN_SIZE"] = 500
+Compress(server)
 
 app.layout = html.Div([
     dcc.Location(id="url", refresh=False),
@@ -1,19 +1,58 @@
 import dash
-from dash import html, dcc, callback, Output, Input
+from dash import html, dcc, callback, Output, Input, State
 import dash_bootstrap_components as dbc
-import pandas as pd
+import threading
 from functools import lru_cache
-from databricks.sdk import WorkspaceClient
+from itertools import islice
+from cachetools import TTLCache
 from utils.components import navbar, error_alert, NAVY
 
 dash.register_page(__name__, path="/catalog", title="Catalog Browser")
 
+# Listings render at most one page at a time so huge catalogs show their
+# first page immediately instead of waiting for full SDK pagination.
+PAGE_SIZE = 200
+
+_ITEM_STYLE = {"fontSize": "0.9em", "cursor": "pointer"}
+
+
+def _list_group(names, item_type, more_id, limit):
+    items = [
+        dbc.ListGroupItem(n, id={"type": item_type, "index": n},
+                          action=True, style=_ITEM_STYLE)
+        for n in names[:limit]
+    ]
+    if len(names) > limit:
+        items.append(dbc.ListGroupItem(
+            "⬇️ Load more…", id=more_id, action=True, color="light",
+            style=_ITEM_STYLE, n_clicks=0))
+    return dbc.ListGroup(items, flush=True)
+
 
 @lru_cache(maxsize=1)
 def _client():
+    # Imported lazily so app startup doesn't pay for the SDK before the
+    # first catalog request needs it.
+    from databricks.sdk import WorkspaceClient
     return WorkspaceClient()
 
 
+# Unity Catalog metadata changes rarely; cache list/get responses for a few
+# minutes so repeated drill-downs skip the REST round-trip.
+_meta_cache = TTLCache(maxsize=256, ttl=300)
+_meta_lock = threading.Lock()
+
+
+def _cached_meta(key, loader):
+    with _meta_lock:
+        if key in _meta_cache:
+            return _meta_cache[key]
+    value = loader()
+    with _meta_lock:
+        _meta_cache[key] = value
+    return value
+
+
 def layout():
     return html.Div([
         navbar("/catalog"),
@@ -23,11 +62,15 @@ def layout():
                    className="text-muted"),
 
             dbc.Row([
-                # Catalog column
+                # Catalog column (rendered eagerly — no extra round trip)
                 dbc.Col([
-                    html.H6("🗄️ Catalogs"),
-                    dcc.Loading(html.Div(id="cat-list")),
-                    dcc.Interval(id="cat-trigger", interval=1, max_intervals=1),
+                    html.Div([
+                        html.H6("🗄️ Catalogs", className="d-inline-block me-2"),
+                        dbc.Button("🔄", id="cat-refresh", color="link",
+                                   size="sm", className="p-0 align-baseline",
+                                   n_clicks=0),
+                    ]),
+                    dcc.Loading(html.Div(_catalog_list(), id="cat-list")),
                 ], md=3, style={"borderRight": "1px solid #eee"}),
 
                 # Schema column
@@ -53,139 +96,212 @@ def layout():
             dcc.Store(id="store-catalog"),
             dcc.Store(id="store-schema"),
             dcc.Store(id="store-table"),
+            dcc.Store(id="store-tables-full"),
+            dcc.Store(id="store-cat-limit", data=PAGE_SIZE),
+            dcc.Store(id="store-schema-limit", data=PAGE_SIZE),
+            dcc.Store(id="store-table-limit", data=PAGE_SIZE),
         ], fluid=True),
     ])
 
 
-# ── Load catalogs ─────────────────────────────────────────────────────────────
-@callback(Output("cat-list", "children"), Input("cat-trigger", "n_intervals"))
-def load_catalogs(_):
+# ── Clientside selection ──────────────────────────────────────────────────────
+# Resolving which list item was clicked happens in the browser; only the
+# selected name travels to the server via the store, instead of the full
+# n_clicks array of every rendered item.
+_SELECT_CLICKED = """
+function(n_clicks) {
+    const t = dash_clientside.callback_context.triggered;
+    if (!t.length || t.every(x => !x.value)) {
+        return dash_clientside.no_update;
+    }
+    const prop_id = t[0].prop_id;
+    return JSON.parse(prop_id.slice(0, prop_id.lastIndexOf("."))).index;
+}
+"""
+
+for _item_type, _store in [("cat-item", "store-catalog"),
+                           ("schema-item", "store-schema"),
+                           ("table-item", "store-table")]:
+    dash.clientside_callback(
+        _SELECT_CLICKED,
+        Output(_store, "data"),
+        Input({"type": _item_type, "index": dash.ALL}, "n_clicks"),
+        prevent_initial_call=True,
+    )
+
+
+# ── Load catalogs (called from layout; callback only for refresh/load-more) ───
+def _load_catalog_names(limit):
+    names = list(islice(
+        (c.name for c in _client().catalogs.list() if c.name), limit + 1))
+    # Surface samples first — done once at cache insertion, so cache hits are
+    # a pure projection into list items.
+    if "samples" in names:
+        names.remove("samples")
+        names.insert(0, "samples")
+    return tuple(names)
+
+
+def _catalog_list(limit=PAGE_SIZE):
     try:
-        w = _client()
-        catalogs = [c.name for c in w.catalogs.list() if c.name]
-        # Surface samples first
-        if "samples" in catalogs:
-            catalogs = ["samples"] + [c for c in catalogs if c != "samples"]
-        return dbc.ListGroup([
-            dbc.ListGroupItem(c, id={"type": "cat-item", "index": c},
-                              action=True, style={"fontSize": "0.9em", "cursor": "pointer"})
-            for c in catalogs
-        ], flush=True)
+        catalogs = _cached_meta(("catalogs", limit),
+                                lambda: _load_catalog_names(limit))
+        return _list_group(catalogs, "cat-item", "cat-more", limit)
     except Exception as e:
         return error_alert(str(e))
 
 
-# ── Catalog click → load schemas ──────────────────────────────────────────────
+@callback(
+    Output("cat-list", "children"),
+    Output("store-cat-limit", "data"),
+    Input("cat-refresh", "n_clicks"),
+    Input("cat-more", "n_clicks"),
+    State("store-cat-limit", "data"),
+    prevent_initial_call=True,
+)
+def refresh_catalogs(_refresh, _more, limit):
+    if dash.ctx.triggered_id == "cat-more":
+        limit = (limit or PAGE_SIZE) + PAGE_SIZE
+    else:
+        limit = PAGE_SIZE
+        with _meta_lock:
+            for key in [k for k in _meta_cache if k[0] == "catalogs"]:
+                _meta_cache.pop(key, None)
+    return _catalog_list(limit), limit
+
+
+# ── Catalog selected → load schemas ───────────────────────────────────────────
 @callback(
     Output("schema-list", "children"),
-    Output("store-catalog", "data"),
-    Input({"type": "cat-item", "index": dash.ALL}, "n_clicks"),
+    Output("store-schema-limit", "data"),
+    Input("store-catalog", "data"),
+    Input("schema-more", "n_clicks"),
+    State("store-schema-limit", "data"),
     prevent_initial_call=True,
 )
-def load_schemas(n_clicks):
-    ctx = dash.callback_context
-    if not ctx.triggered or not any(n_clicks):
+def load_schemas(cat, _more, limit):
+    if not cat:
         return dash.no_update, dash.no_update
-    cat = ctx.triggered_id["index"]
+    if dash.ctx.triggered_id == "schema-more":
+        limit = (limit or PAGE_SIZE) + PAGE_SIZE
+    else:
+        limit = PAGE_SIZE
     try:
         w = _client()
-        schemas = [s.name for s in w.schemas.list(catalog_name=cat) if s.name]
-        return (
-            dbc.ListGroup([
-                dbc.ListGroupItem(s, id={"type": "schema-item", "index": s},
-                                  action=True, style={"fontSize": "0.9em", "cursor": "pointer"})
-                for s in schemas
-            ], flush=True),
-            cat,
-        )
+        schemas = _cached_meta(
+            ("schemas", cat, limit),
+            lambda: list(islice(
+                (s.name for s in w.schemas.list(catalog_name=cat) if s.name),
+                limit + 1)))
+        return _list_group(schemas, "schema-item", "schema-more", limit), limit
     except Exception as e:
         return error_alert(str(e)), dash.no_update
 
 
-# ── Schema click → load tables ────────────────────────────────────────────────
+def _table_info_dict(t) -> dict:
+    """Project a TableInfo into the JSON-serializable subset the detail pane needs."""
+    return {
+        "type": t.table_type.value if t.table_type else None,
+        "owner": t.owner,
+        "format": t.data_source_format.value if t.data_source_format else None,
+        "comment": t.comment,
+        "columns": [{
+            "name": c.name,
+            "type": c.type_text or str(c.type_name),
+            "nullable": bool(c.nullable),
+        } for c in (t.columns or [])],
+    }
+
+
+# ── Schema selected → load tables (full metadata in one batched call) ─────────
 @callback(
     Output("table-list", "children"),
-    Output("store-schema", "data"),
-    Input({"type": "schema-item", "index": dash.ALL}, "n_clicks"),
-    Input("store-catalog", "data"),
+    Output("store-tables-full", "data"),
+    Output("store-table-limit", "data"),
+    Input("store-schema", "data"),
+    Input("table-more", "n_clicks"),
+    State("store-catalog", "data"),
+    State("store-table-limit", "data"),
     prevent_initial_call=True,
 )
-def load_tables(n_clicks, catalog):
-    ctx = dash.callback_context
-    if not ctx.triggered or not catalog:
-        return dash.no_update, dash.no_update
-    triggered = ctx.triggered_id
-    if not isinstance(triggered, dict) or triggered.get("type") != "schema-item":
-        return dash.no_update, dash.no_update
-    schema = triggered["index"]
+def load_tables(schema, _more, catalog, limit):
+    if not schema or not catalog:
+        return dash.no_update, dash.no_update, dash.no_update
+    if dash.ctx.triggered_id == "table-more":
+        limit = (limit or PAGE_SIZE) + PAGE_SIZE
+    else:
+        limit = PAGE_SIZE
     try:
         w = _client()
-        tables = [t.name for t in w.tables.list(catalog_name=catalog, schema_name=schema) if t.name]
-        return (
-            dbc.ListGroup([
-                dbc.ListGroupItem(t, id={"type": "table-item", "index": t},
-                                  action=True, style={"fontSize": "0.9em", "cursor": "pointer"})
-                for t in tables
-            ], flush=True),
-            schema,
-        )
+        # tables.list already returns column metadata inline, so one REST call
+        # covers the rendered page and table clicks are served from the store.
+        tables_full = _cached_meta(
+            ("tables", catalog, schema, limit),
+            lambda: dict(islice(
+                ((t.name, _table_info_dict(t))
+                 for t in w.tables.list(catalog_name=catalog, schema_name=schema)
+                 if t.name),
+                limit + 1)))
+        return (_list_group(list(tables_full), "table-item", "table-more", limit),
+                tables_full, limit)
     except Exception as e:
-        return error_alert(str(e)), dash.no_update
+        return error_alert(str(e)), dash.no_update, dash.no_update
 
 
-# ── Table click → show details ────────────────────────────────────────────────
+# ── Table selected → show details (served from the prefetched store) ──────────
 @callback(
     Output("table-detail", "children"),
-    Input({"type": "table-item", "index": dash.ALL}, "n_clicks"),
-    Input("store-catalog", "data"),
-    Input("store-schema", "data"),
+    Input("store-table", "data"),
+    State("store-catalog", "data"),
+    State("store-schema", "data"),
+    State("store-tables-full", "data"),
     prevent_initial_call=True,
 )
-def show_detail(n_clicks, catalog, schema):
-    ctx = dash.callback_context
-    if not ctx.triggered or not catalog or not schema:
+def show_detail(table, catalog, schema, tables_full):
+    if not table or not catalog or not schema:
         return dash.no_update
-    triggered = ctx.triggered_id
-    if not isinstance(triggered, dict) or triggered.get("type") != "table-item":
-        return dash.no_update
-    table = triggered["index"]
-    try:
-        w = _client()
-        t = w.tables.get(full_name=f"{catalog}.{schema}.{table}")
-
-        meta = [
-            html.P([html.Strong("Type: "), html.Code(t.table_type.value if t.table_type else "n/a")]),
-            html.P([html.Strong("Owner: "), t.owner or "n/a"]),
-            html.P([html.Strong("Format: "), html.Code(
-                t.data_source_format.value if t.data_source_format else "n/a")]),
-        ]
-        if t.comment:
-            meta.append(dbc.Alert(t.comment, color="info", className="py-2"))
-
-        cols_section = html.Div()
-        if t.columns:
-            col_df = pd.DataFrame([{
-                "Column": c.name,
-                "Type": c.type_text or str(c.type_name),
-                "Nullable": "✅" if c.nullable else "❌",
-            } for c in t.columns])
-            cols_section = html.Div([
-                html.Strong("Schema", className="d-block mt-2 mb-1"),
-                dbc.Table.from_dataframe(col_df, striped=True, bordered=False,
-                                         hover=True, size="sm", responsive=True),
-            ])
-
-        col_names = ", ".join([c.name for c in t.columns]) if t.columns else "*"
-        sql_ref = html.Div([
-            html.Strong("SQL Reference", className="d-block mt-2 mb-1"),
-            html.Pre(
-                f"SELECT {col_names}\nFROM {catalog}.{schema}.{table}\nLIMIT 100",
-                style={"background": "#f5f5f5", "padding": "10px",
-                       "borderRadius": "6px", "fontSize": "0.8em",
-                       "overflowX": "auto"},
+    t = (tables_full or {}).get(table)
+    if t is None:
+        return error_alert(f"No metadata found for {table}. Reselect the schema.")
+
+    meta = [
+        html.P([html.Strong("Type: "), html.Code(t["type"] or "n/a")]),
+        html.P([html.Strong("Owner: "), t["owner"] or "n/a"]),
+        html.P([html.Strong("Format: "), html.Code(t["format"] or "n/a")]),
+    ]
+    if t["comment"]:
+        meta.append(dbc.Alert(t["comment"], color="info", className="py-2"))
+
+    cols_section = html.Div()
+    if t["columns"]:
+        # AgGrid serializes the column dicts once and virtualizes rows in the
+        # browser — constant server-side cost even for 500+ column tables.
+        import dash_ag_grid as dag
+        cols_section = html.Div([
+            html.Strong("Schema", className="d-block mt-2 mb-1"),
+            dag.AgGrid(
+                rowData=t["columns"],
+                columnDefs=[
+                    {"field": "name", "headerName": "Column"},
+                    {"field": "type", "headerName": "Type"},
+                    {"field": "nullable", "headerName": "Nullable",
+                     "valueFormatter": {"function": "params.value ? '✅' : '❌'"}},
+                ],
+                columnSize="sizeToFit",
+                dashGridOptions={"rowBuffer": 10},
+                style={"height": "300px"},
             ),
         ])
 
-        return html.Div(meta + [cols_section, sql_ref])
-    except Exception as e:
-        return error_alert(str(e))
+    col_names = ", ".join([c["name"] for c in t["columns"]]) if t["columns"] else "*"
+    sql_ref = html.Div([
+        html.Strong("SQL Reference", className="d-block mt-2 mb-1"),
+        html.Pre(
+            f"SELECT {col_names}\nFROM {catalog}.{schema}.{table}\nLIMIT 100",
+            style={"background": "#f5f5f5", "padding": "10px",
+                   "borderRadius": "6px", "fontSize": "0.8em",
+                   "overflowX": "auto"},
+        ),
+    ])
+
+    return html.Div(meta + [cols_section, sql_ref])
@@ -1,38 +1,52 @@
 import dash
-from dash import html, dcc, callback, Output, Input
+from dash import html, callback, Output, Input
 import dash_bootstrap_components as dbc
-from flask import request
-from databricks.sdk import WorkspaceClient
+from flask import has_request_context, request
+from functools import lru_cache
 from utils.components import navbar, kpi_card, error_alert, RED
 
 dash.register_page(__name__, path="/identity", title="Identity & Access")
 
 
+@lru_cache(maxsize=128)
+def _client_for(token: str):
+    """One WorkspaceClient per OBO token — repeat requests from the same user
+    skip credential resolution and TLS setup."""
+    from databricks.sdk import WorkspaceClient
+    return WorkspaceClient(token=token, auth_type="pat")
+
+
 def layout():
+    # layout() runs inside the page request, so the identity sections render
+    # directly into the initial response — no fire-on-mount round trip.
     return html.Div([
         navbar("/identity"),
         dbc.Container([
             html.H2("👤 My Identity & Access"),
             html.P("Your identity as seen by this Databricks App, from HTTP headers and the Databricks SDK.",
                    className="text-muted"),
-            html.Div(id="identity-content"),
-            dcc.Interval(id="identity-trigger", interval=1, max_intervals=1),
+            dbc.Button("🔄 Refresh", id="identity-refresh", color="dark",
+                       outline=True, size="sm", className="mb-3", n_clicks=0),
+            html.Div(_identity_sections(), id="identity-content"),
         ], fluid=True),
     ])
 
 
-@callback(Output("identity-content", "children"), Input("identity-trigger", "n_intervals"))
-def load_identity(_):
-    try:
-        headers = request.headers
-        email    = headers.get("X-Forwarded-Email", "")
-        username = headers.get("X-Forwarded-Preferred-Username", "")
-        user_id  = headers.get("X-Forwarded-User", "")
-        ip       = headers.get("X-Real-Ip", "")
-        token    = headers.get("X-Forwarded-Access-Token", "")
-    except RuntimeError:
-        # Outside request context (e.g. local dev without headers)
-        email = username = user_id = ip = token = ""
+@callback(Output("identity-content", "children"),
+          Input("identity-refresh", "n_clicks"), prevent_initial_call=True)
+def refresh_identity(_):
+    return _identity_sections()
+
+
+def _identity_sections():
+    # Outside request context (e.g. local dev without headers) fall back to
+    # an empty mapping rather than exception-driven control flow.
+    headers = request.headers if has_request_context() else {}
+    email    = headers.get("X-Forwarded-Email", "")
+    username = headers.get("X-Forwarded-Preferred-Username", "")
+    user_id  = headers.get("X-Forwarded-User", "")
+    ip       = headers.get("X-Real-Ip", "")
+    token    = headers.get("X-Forwarded-Access-Token", "")
 
     sections = [
         dbc.Row([
@@ -45,7 +59,7 @@ def load_identity(_):
 
     if token:
         try:
-            w = WorkspaceClient(token=token, auth_type="pat")
+            w = _client_for(token)
             me = w.current_user.me()
 
             detail_rows = [
@@ -85,9 +99,9 @@ def load_identity(_):
             except Exception:
                 pass
             try:
-                from databricks.sdk.core import Config
-                cfg = Config(token=token)
-                sections.append(html.P([html.Strong("Host: "), html.Code(cfg.host)]))
+                # The client already resolved the host — no need to build a
+                # second Config just to read it.
+                sections.append(html.P([html.Strong("Host: "), html.Code(w.config.host)]))
             except Exception:
                 pass
 
@@ -104,10 +118,8 @@ def load_identity(_):
         ))
 
     # Raw headers (safe subset)
-    try:
-        safe = {k: v for k, v in request.headers if "token" not in k.lower() and "secret" not in k.lower()}
-    except RuntimeError:
-        safe = {}
+    safe = {k: v for k, v in headers.items()
+            if "token" not in k.lower() and "secret" not in k.lower()}
 
     sections.append(html.Hr())
     sections.append(html.Details([
@@ -1,15 +1,47 @@
 import dash
 from dash import html, dcc, callback, Output, Input, State, dash_table
 import dash_bootstrap_components as dbc
-import plotly.express as px
-import pandas as pd
-import io
-import base64
-from utils.components import navbar, error_alert, RED
-from utils.sql_client import run_query, get_warehouse_http_path
+import re
+import threading
+import uuid
+from cachetools import TTLCache
+from utils.components import navbar, error_alert, warehouse_missing
+from utils.sql_client import run_query_arrow, get_warehouse_http_path
 
 dash.register_page(__name__, path="/sql", title="SQL Explorer")
 
+# Server-side result cache: the dcc.Store carries only an opaque key, and the
+# viz callback re-reads the typed Arrow table instead of parsing a JSONified
+# DataFrame on every dropdown change.
+_RESULTS = TTLCache(maxsize=32, ttl=3600)
+_results_lock = threading.Lock()
+
+TABLE_PAGE_SIZE = 20
+
+# Word-bounded so identifiers like fare_limit_col don't suppress the wrap,
+# and no lowercase copy of the whole query is allocated per submit.
+_LIMIT_RE = re.compile(r"\blimit\b", re.IGNORECASE)
+
+# Last auto-viz render: flipping a dropdown back to its previous value would
+# otherwise redo the column select, pandas conversion and px build for an
+# identical figure. result_key is a fresh uuid per query, so it doubles as
+# the data version in the key. Kept as a single (key, graph) tuple rebound
+# in one assignment so concurrent callbacks never see a torn pair.
+_last_viz = (None, None)
+
+
+def _records(tbl, start, stop):
+    """Row dicts for one DataTable page, built column-wise from Arrow.
+
+    ``zip(*[c.to_pylist() ...])`` over the sliced window skips pandas'
+    per-cell boxing, and only the visible page is ever materialized.
+    """
+    window = tbl.slice(start, max(stop - start, 0))
+    cols = window.column_names
+    return [dict(zip(cols, row))
+            for row in zip(*[c.to_pylist() for c in window.columns])]
+
+
 STARTER_QUERIES = {
     "-- Select a starter query --": "",
     "📦 TPC-H: Top 10 orders by value":
@@ -47,55 +79,57 @@ STARTER_QUERIES = {
         "GROUP BY 1 ORDER BY MIN(trip_distance)",
 }
 
+STARTER_DROPDOWN_OPTIONS = [{"label": k, "value": k} for k in STARTER_QUERIES]
+
+# The page tree has no runtime state, so build it once at import time and
+# hand the same object back on every navigation (same pattern as home.py).
+_LAYOUT = html.Div([
+    navbar("/sql"),
+    dbc.Container([
+        html.H2("🔍 SQL Explorer"),
+        html.P("Run ad-hoc SQL against the samples catalog using the connected Serverless SQL Warehouse.",
+               className="text-muted"),
+
+        dbc.Card(dbc.CardBody([
+            dbc.Row([
+                dbc.Col([
+                    html.Label("💡 Starter Queries"),
+                    dcc.Dropdown(id="sql-starter",
+                                 options=STARTER_DROPDOWN_OPTIONS,
+                                 value="-- Select a starter query --",
+                                 clearable=False),
+                ], md=8),
+                dbc.Col([
+                    html.Label("Max Rows"),
+                    dcc.Input(id="sql-maxrows", type="number", value=500,
+                              min=10, max=5000, step=100,
+                              className="form-control"),
+                ], md=4),
+            ], className="mb-3"),
+
+            html.Label("SQL Query"),
+            dcc.Textarea(
+                id="sql-editor",
+                value="SELECT * FROM samples.tpch.orders LIMIT 20",
+                style={"width": "100%", "height": "160px", "fontFamily": "monospace",
+                       "fontSize": "0.9em", "borderRadius": "6px", "padding": "10px"},
+            ),
+            dbc.Button("▶️ Run Query", id="sql-run", color="danger",
+                       className="mt-2", n_clicks=0),
+        ]), className="mb-4 shadow-sm"),
+
+        dcc.Loading(html.Div(id="sql-results")),
+
+        dcc.Store(id="sql-data-store"),
+        dcc.Download(id="sql-download"),
+    ], fluid=True),
+])
+
 
 def layout():
     if not get_warehouse_http_path():
-        return html.Div([navbar("/sql"), dbc.Container(
-            error_alert(
-                "No SQL Warehouse found. Set DATABRICKS_WAREHOUSE_ID in app.yaml.")
-        )])
-
-    return html.Div([
-        navbar("/sql"),
-        dbc.Container([
-            html.H2("🔍 SQL Explorer"),
-            html.P("Run ad-hoc SQL against the samples catalog using the connected Serverless SQL Warehouse.",
-                   className="text-muted"),
-
-            dbc.Card(dbc.CardBody([
-                dbc.Row([
-                    dbc.Col([
-                        html.Label("💡 Starter Queries"),
-                        dcc.Dropdown(id="sql-starter",
-                                     options=[{"label": k, "value": k}
-                                              for k in STARTER_QUERIES],
-                                     value="-- Select a starter query --",
-                                     clearable=False),
-                    ], md=8),
-                    dbc.Col([
-                        html.Label("Max Rows"),
-                        dcc.Input(id="sql-maxrows", type="number", value=500,
-                                  min=10, max=5000, step=100,
-                                  className="form-control"),
-                    ], md=4),
-                ], className="mb-3"),
-
-                html.Label("SQL Query"),
-                dcc.Textarea(
-                    id="sql-editor",
-                    value="SELECT * FROM samples.tpch.orders LIMIT 20",
-                    style={"width": "100%", "height": "160px", "fontFamily": "monospace",
-                           "fontSize": "0.9em", "borderRadius": "6px", "padding": "10px"},
-                ),
-                dbc.Button("▶️ Run Query", id="sql-run", color="danger",
-                           className="mt-2", n_clicks=0),
-            ]), className="mb-4 shadow-sm"),
-
-            dcc.Loading(html.Div(id="sql-results")),
-
-            dcc.Store(id="sql-data-store"),
-        ], fluid=True),
-    ])
+        return warehouse_missing("/sql")
+    return _LAYOUT
 
 
 # Populate editor from starter dropdown
@@ -122,34 +156,39 @@ def run_sql(_, query, max_rows):
         return dbc.Alert("Please enter a SQL query.", color="warning"), None
 
     safe = query.strip().rstrip(";")
-    if "limit" not in safe.lower():
+    if not _LIMIT_RE.search(safe):
         safe = f"SELECT * FROM ({safe}) _q LIMIT {max_rows or 500}"
 
     try:
-        df = run_query(safe)
+        tbl = run_query_arrow(safe)
     except Exception as e:
         return error_alert(str(e)), None
 
-    # DataTable
+    result_key = str(uuid.uuid4())
+    with _results_lock:
+        _RESULTS[result_key] = tbl
+    df = tbl.to_pandas()
+
+    # DataTable with server-side paging: only the visible window is ever
+    # converted to row dicts, so a 5 000-row result costs the same as 20.
     table = dash_table.DataTable(
-        data=df.to_dict("records"),
-        columns=[{"name": c, "id": c} for c in df.columns],
-        page_size=20,
-        sort_action="native",
-        filter_action="native",
+        id="sql-table",
+        data=_records(tbl, 0, TABLE_PAGE_SIZE),
+        columns=[{"name": c, "id": c} for c in tbl.column_names],
+        page_action="custom",
+        page_current=0,
+        page_size=TABLE_PAGE_SIZE,
+        page_count=(tbl.num_rows + TABLE_PAGE_SIZE - 1) // TABLE_PAGE_SIZE,
         style_table={"overflowX": "auto"},
         style_header={"fontWeight": "bold", "backgroundColor": "#f5f5f5"},
         style_cell={"fontSize": "0.85em", "padding": "6px"},
     )
 
-    # CSV download link (data URI — no automatic browser download)
-    csv_b64 = base64.b64encode(df.to_csv(index=False).encode()).decode()
-    dl_link = html.A(
-        "⬇️ Download CSV",
-        href=f"data:text/csv;base64,{csv_b64}",
-        download="query_results.csv",
-        className="btn btn-outline-secondary btn-sm mt-2 d-inline-block",
-    )
+    # CSV is generated on demand by download_csv — no base64 payload inlined
+    # into the page.
+    dl_btn = dbc.Button("⬇️ Download CSV", id="sql-download-btn",
+                        color="secondary", outline=True, size="sm",
+                        className="mt-2", n_clicks=0)
 
     # Auto-viz controls
     numeric_cols = df.select_dtypes(include="number").columns.tolist()
@@ -176,13 +215,49 @@ def run_sql(_, query, max_rows):
         ]), className="mt-3 shadow-sm")
 
     content = [
-        dbc.Alert(f"✅ {len(df):,} rows returned", color="success"),
+        dbc.Alert(f"✅ {tbl.num_rows:,} rows returned", color="success"),
         table,
-        dl_link,
+        dl_btn,
         viz_section,
     ]
 
-    return content, df.to_json(date_format="iso", orient="split")
+    return content, result_key
+
+
+# Write the CSV only when asked, straight from the cached Arrow table.
+@callback(
+    Output("sql-download", "data"),
+    Input("sql-download-btn", "n_clicks"),
+    State("sql-data-store", "data"),
+    prevent_initial_call=True,
+)
+def download_csv(_, result_key):
+    with _results_lock:
+        tbl = _RESULTS.get(result_key) if result_key else None
+    if tbl is None:
+        return dash.no_update
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+    buf = pa.BufferOutputStream()
+    pacsv.write_csv(tbl, buf)
+    return dcc.send_bytes(buf.getvalue().to_pybytes(), "query_results.csv")
+
+
+# Serve DataTable pages by slicing the cached Arrow table
+@callback(
+    Output("sql-table", "data"),
+    Input("sql-table", "page_current"),
+    State("sql-table", "page_size"),
+    State("sql-data-store", "data"),
+    prevent_initial_call=True,
+)
+def page_results(page_current, page_size, result_key):
+    with _results_lock:
+        tbl = _RESULTS.get(result_key) if result_key else None
+    if tbl is None:
+        return []
+    start = (page_current or 0) * page_size
+    return _records(tbl, start, start + page_size)
 
 
 # Auto-viz chart
@@ -194,20 +269,42 @@ def run_sql(_, query, max_rows):
     State("sql-data-store", "data"),
     prevent_initial_call=True,
 )
-def update_viz(x, y, chart_type, data_json):
-    if not data_json:
+def update_viz(x, y, chart_type, result_key):
+    global _last_viz
+    if not result_key:
         return None
-    df = pd.read_json(io.StringIO(data_json), orient="split")
+    key = (x, y, chart_type, result_key)
+    last_key, last_graph = _last_viz
+    if key == last_key:
+        return last_graph
+    with _results_lock:
+        tbl = _RESULTS.get(result_key)
+    if tbl is None:
+        return dbc.Alert("Result expired — re-run the query.", color="warning")
+    import plotly.express as px  # deferred: keeps worker cold-start lean
     try:
+        # Zero-copy typed read of just the plotted columns — px introspects
+        # (and copies) every column it is given, so never hand it the full
+        # frame. Project a single column when both axes agree (the default
+        # render starts with x == y): px rejects duplicate column names.
+        df = tbl.select([x] if x == y else [x, y]).to_pandas().dropna()
         if chart_type == "Bar":
             fig = px.bar(df, x=x, y=y)
         elif chart_type == "Line":
             fig = px.line(df, x=x, y=y, markers=True)
         elif chart_type == "Scatter":
-            fig = px.scatter(df, x=x, y=y, opacity=0.6)
+            # WebGL keeps dense scatters off the SVG renderer.
+            fig = px.scatter(df, x=x, y=y, opacity=0.6,
+                             render_mode="webgl" if len(df) > 2_000 else "auto")
+            if len(df) > 10_000:
+                # Hover builds a quadtree client-side — skip it at this size.
+                fig.update_traces(hoverinfo="skip", hovertemplate=None)
         else:
             fig = px.area(df, x=x, y=y)
-        fig.update_layout(margin=dict(t=30))
-        return dcc.Graph(figure=fig)
+        # uirevision preserves pan/zoom state across re-renders.
+        fig.update_layout(margin=dict(t=30), uirevision="viz")
+        graph = dcc.Graph(figure=fig, config={"responsive": True})
+        _last_viz = (key, graph)
+        return graph
     except Exception as e:
         return error_alert(str(e))
@@ -1,4 +1,6 @@
 """Shared layout helpers and theme for the Databricks Demo Dash App."""
+from functools import cache
+
 import dash_bootstrap_components as dbc
 from dash import html
 
@@ -10,7 +12,13 @@ DARK = "#1A1A1A"
 LIGHT = "#F5F5F5"
 
 
+@cache
 def navbar(active: str = "") -> dbc.NavbarSimple:
+    """Top navigation bar, built once per distinct active page.
+
+    Dash re-runs every page's layout() on URL changes, so without the cache
+    the same six NavLink objects were reallocated on each navigation.
+    """
     pages = [
         ("🏠 Home",            "/"),
         ("👤 Identity",        "/identity"),
@@ -43,6 +51,20 @@ def kpi_card(title: str, value: str, color: str = RED) -> dbc.Card:
     )
 
 
+@cache
+def warehouse_missing(active: str) -> html.Div:
+    """Static fallback page for SQL pages when no warehouse is discoverable.
+
+    Pure function of ``active``, so the tree is built once per page and
+    reused on every subsequent layout() call.
+    """
+    return html.Div([
+        navbar(active),
+        dbc.Container(error_alert(
+            "No SQL Warehouse found. Set DATABRICKS_WAREHOUSE_ID in app.yaml.")),
+    ])
+
+
 def error_alert(msg: str) -> dbc.Alert:
     return dbc.Alert(f"⚠️ {msg}", color="danger", className="mt-3")
 
@@ -3,8 +3,14 @@ Shared SQL connection utility.
 Uses DATABRICKS_WAREHOUSE_ID env var (set in app.yaml) or auto-discovers
 the first available warehouse via the SDK.
 """
+import hashlib
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from functools import lru_cache
+from cachetools import TTLCache
 from databricks.sdk import WorkspaceClient
 from databricks.sdk.core import Config
 from databricks import sql
@@ -32,8 +38,17 @@ def get_warehouse_http_path() -> str | None:
     return None
 
 
-@lru_cache(maxsize=1)
-def get_connection(http_path: str):
+# ── Connection pool ──────────────────────────────────────────────────────────
+# A single cached connection serialized the orchestrators' parallel queries
+# on one HTTP transport. A small lazily-filled pool lets concurrent section
+# queries actually overlap; POOL_SIZE matches the executors' max_workers.
+POOL_SIZE = 4
+_pool: queue.Queue = queue.Queue(maxsize=POOL_SIZE)
+_pool_lock = threading.Lock()
+_pool_created = 0
+
+
+def _new_connection(http_path: str):
     cfg = Config()
     return sql.connect(
         server_hostname=cfg.host,
@@ -42,12 +57,140 @@ def get_connection(http_path: str):
     )
 
 
-def run_query(query: str) -> "pd.DataFrame":
-    import pandas as pd
+@contextmanager
+def get_connection(http_path: str):
+    """Check a pooled connection out for the duration of the block.
+
+    Connections are created on demand up to POOL_SIZE and kept alive across
+    requests; callers past the pool limit block until one is returned.
+    """
+    global _pool_created
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        with _pool_lock:
+            grow = _pool_created < POOL_SIZE
+            if grow:
+                _pool_created += 1
+        if grow:
+            try:
+                conn = _new_connection(http_path)
+            except Exception:
+                # Give the slot back so a later call retries the connect —
+                # otherwise a transient failure (warehouse still starting)
+                # would shrink the pool permanently.
+                with _pool_lock:
+                    _pool_created -= 1
+                raise
+        else:
+            conn = _pool.get()
+    try:
+        yield conn
+    except Exception:
+        # The failure may be the transport itself — drop the connection and
+        # free its slot rather than poisoning the pool with a dead one.
+        with _pool_lock:
+            _pool_created -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+        raise
+    else:
+        _pool.put(conn)
+
+
+def run_query_arrow(query: str, params: dict | None = None) -> "pa.Table":
+    """Run a query with optional named parameters (``:name`` markers) and
+    return the Arrow Table as fetched — no pandas materialization.
+
+    Binding values instead of inlining them keeps the SQL text stable across
+    filter changes, so the warehouse can reuse plans and its result cache.
+    """
     http_path = get_warehouse_http_path()
     if not http_path:
         raise RuntimeError("No SQL warehouse available.")
-    conn = get_connection(http_path)
-    with conn.cursor() as cursor:
-        cursor.execute(query)
-        return cursor.fetchall_arrow().to_pandas()
+    with get_connection(http_path) as conn, conn.cursor() as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchall_arrow()
+
+
+def run_query(query: str, params: dict | None = None) -> "pd.DataFrame":
+    """Pandas convenience wrapper around :func:`run_query_arrow`."""
+    return run_query_arrow(query, params).to_pandas()
+
+
+# ── TTL-bounded result cache ──────────────────────────────────────────────────
+# Identical (sql, params) within the TTL window skips the warehouse
+# round-trip entirely. Past half the TTL a hit still serves the cached table
+# but refreshes in the background, so users never block on staleness.
+# Entries are immutable Arrow tables: every hit is a zero-copy handout and
+# callers convert to pandas only at the UI edge.
+_CACHE_TTL = 600
+_query_cache = TTLCache(maxsize=128, ttl=_CACHE_TTL)
+_cache_lock = threading.Lock()
+_cache_epoch = 0
+_refreshing: set = set()
+
+
+def invalidate_query_cache() -> None:
+    """Bump the cache epoch so every subsequent lookup misses."""
+    global _cache_epoch
+    with _cache_lock:
+        _cache_epoch += 1
+
+
+def _cache_key(query: str, params: dict | None) -> str:
+    payload = (f"{_cache_epoch}|{' '.join(query.split())}"
+               f"|{sorted(params.items()) if params else None}")
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def cached_run_query_arrow(query: str, params: dict | None = None) -> "pa.Table":
+    key = _cache_key(query, params)
+    with _cache_lock:
+        hit = _query_cache.get(key)
+    if hit is not None:
+        stored_at, tbl = hit
+        if time.monotonic() - stored_at > _CACHE_TTL / 2:
+            _refresh_in_background(key, query, params)
+        return tbl
+    return _store(key, run_query_arrow(query, params))
+
+
+def cached_run_query(query: str, params: dict | None = None) -> "pd.DataFrame":
+    return cached_run_query_arrow(query, params).to_pandas()
+
+
+def run_scalars(query: str, params: dict | None = None) -> dict:
+    """One-row aggregate result as ``{column: python scalar}``.
+
+    Reads straight off the Arrow columns — no DataFrame, block manager or
+    Series gets allocated for a four-number KPI row.
+    """
+    tbl = cached_run_query_arrow(query, params)
+    return {name: tbl.column(name)[0].as_py() for name in tbl.column_names}
+
+
+def _store(key, tbl):
+    with _cache_lock:
+        _query_cache[key] = (time.monotonic(), tbl)
+    return tbl
+
+
+def _refresh_in_background(key, query, params=None):
+    with _cache_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def refresh():
+        try:
+            _store(key, run_query_arrow(query, params))
+        except Exception:
+            pass  # keep serving the stale value; next miss retries inline
+        finally:
+            with _cache_lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=refresh, daemon=True).start()